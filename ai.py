@@ -1,62 +1,801 @@
 import chess
+import chess.polyglot
 import math
+import threading
+import time
+from operator import itemgetter
+
+# Transposition table bound types
+EXACT = 0
+LOWERBOUND = 1
+UPPERBOUND = 2
+
+# Move ordering priorities, highest first; quiet moves use the history score
+ORDER_PV = 40_000_000
+ORDER_TT = 30_000_000
+ORDER_CAPTURE = 20_000_000
+ORDER_PROMOTION = 15_000_000
+ORDER_KILLER = 10_000_000
+
+# Piece values used for MVV-LVA capture ordering, indexed by piece type
+MVV_LVA_VALUES = [0, 1, 3, 3, 5, 9, 10]
+
+# Material values in centipawns
+PIECE_VALUES = {
+    chess.PAWN: 100,
+    chess.KNIGHT: 320,
+    chess.BISHOP: 330,
+    chess.ROOK: 500,
+    chess.QUEEN: 900,
+    chess.KING: 20000
+}
+
+# Piece-square tables from White's point of view, listed from a8 to h1
+PIECE_SQUARE_TABLES = {
+    chess.PAWN: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ],
+    chess.KNIGHT: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ],
+    chess.BISHOP: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ],
+    chess.ROOK: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ],
+    chess.QUEEN: [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ],
+    chess.KING: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ],
+}
+
+
+def _signed_tables(include_material):
+    # tables[color][piece_type][square], positive for White, negative for Black
+    tables = {}
+    for color in chess.COLORS:
+        sign = 1 if color == chess.WHITE else -1
+        tables[color] = {}
+        for piece_type, table in PIECE_SQUARE_TABLES.items():
+            material = PIECE_VALUES[piece_type] if include_material else 0
+            # The tables start at a8, so White squares are mirrored to index them
+            tables[color][piece_type] = [
+                sign * (material + table[square ^ 56 if color == chess.WHITE else square])
+                for square in chess.SQUARES
+            ]
+    return tables
+
+
+PST_SCORES = _signed_tables(include_material=False)
+SQUARE_SCORES = _signed_tables(include_material=True)
+
+
+class IncrementalEvaluator:
+    """Material + piece-square score kept as a running total during search.
+
+    push/pop apply the score change of each move instead of rescanning the
+    board. With ``check=True`` every update is compared with a full
+    recompute, which is slow but catches any drift.
+    """
+
+    def __init__(self, check=False):
+        self.check = check
+        self.score = 0
+        self._deltas = []
+
+    @staticmethod
+    def full(board):
+        score = 0
+        for color in chess.COLORS:
+            sign = 1 if color == chess.WHITE else -1
+            for piece_type in chess.PIECE_TYPES:
+                mask = board.pieces_mask(piece_type, color)
+                if not mask:
+                    continue
+                score += sign * PIECE_VALUES[piece_type] * chess.popcount(mask)
+                table = PST_SCORES[color][piece_type]
+                for square in chess.scan_forward(mask):
+                    score += table[square]
+        return score
+
+    def reset(self, board):
+        self.score = self.full(board)
+        self._deltas = []
+
+    @staticmethod
+    def delta(board, move):
+        color = board.turn
+        tables = SQUARE_SCORES[color]
+        piece_type = board.piece_type_at(move.from_square)
+
+        if board.is_castling(move):
+            rank = chess.square_rank(move.from_square)
+            kingside = board.is_kingside_castling(move)
+            king_to = chess.square(6 if kingside else 2, rank)
+            rook_to = chess.square(5 if kingside else 3, rank)
+            # Standard castling moves the king two squares; Chess960 encodes king-takes-rook
+            if board.color_at(move.to_square) == color:
+                rook_from = move.to_square
+            else:
+                rook_from = chess.square(7 if kingside else 0, rank)
+            rook_table = tables[chess.ROOK]
+            return (tables[chess.KING][king_to] - tables[chess.KING][move.from_square]
+                    + rook_table[rook_to] - rook_table[rook_from])
+
+        new_type = move.promotion or piece_type
+        delta = tables[new_type][move.to_square] - tables[piece_type][move.from_square]
+        if board.is_en_passant(move):
+            victim_square = move.to_square - 8 if color == chess.WHITE else move.to_square + 8
+            delta -= SQUARE_SCORES[not color][chess.PAWN][victim_square]
+        else:
+            victim = board.piece_type_at(move.to_square)
+            if victim:
+                delta -= SQUARE_SCORES[not color][victim][move.to_square]
+        return delta
+
+    def push(self, board, move):
+        delta = self.delta(board, move)
+        self._deltas.append(delta)
+        self.score += delta
+        board.push(move)
+        if self.check:
+            assert self.score == self.full(board), f"incremental eval drifted after {move.uci()}"
+
+    def pop(self, board):
+        board.pop()
+        self.score -= self._deltas.pop()
+        if self.check:
+            assert self.score == self.full(board), "incremental eval drifted on pop"
+
+
+# Checkmate scores are MATE_SCORE minus the distance in plies, so shorter
+# mates score higher; anything beyond MATE_BOUND is a mate score
+MATE_SCORE = 100_000
+MATE_BOUND = MATE_SCORE - 1000
+
+# Quiescence search: skip captures that cannot bring the score within
+# DELTA_MARGIN of alpha, and stop extending after QS_MAX_PLY plies
+DELTA_MARGIN = 200
+QS_MAX_PLY = 8
+
+# Entries are packed into a single int next to their key:
+# move (15 bits) | flag (2 bits) | depth (8 bits) | score + TT_SCORE_OFFSET
+TT_SCORE_OFFSET = 1 << 21
+TT_MOVE_BITS = 15
+TT_FLAG_SHIFT = 15
+TT_DEPTH_SHIFT = 17
+TT_SCORE_SHIFT = 25
+
+# Measured cost of one filled slot: a 64-bit key int, the packed data int
+# and the two list pointers that hold them
+TT_ENTRY_BYTES = 96
+
+
+def _pack_move(move):
+    if move is None:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def _unpack_move(packed):
+    if not packed:
+        return None
+    return chess.Move(packed & 63, (packed >> 6) & 63, (packed >> 12) or None)
+
+
+class TranspositionTable:
+    """Zobrist-keyed table of search results with a fixed memory cap.
+
+    Each bucket has two slots: a depth-preferred slot that only gives way to
+    an equal or deeper search, and an always-replace slot for everything else.
+    Keys and packed entries live in two flat lists so the memory use per slot
+    stays at TT_ENTRY_BYTES.
+    """
+
+    def __init__(self, size_mb=16):
+        self.resize(size_mb)
+
+    def resize(self, size_mb):
+        self.size_mb = size_mb
+        self.num_buckets = max(1, (size_mb * 1024 * 1024) // (2 * TT_ENTRY_BYTES))
+        self.clear()
+
+    def clear(self):
+        self.keys = [None] * (2 * self.num_buckets)
+        self.data = [0] * (2 * self.num_buckets)
+        self.stats = {'probes': 0, 'hits': 0, 'cutoffs': 0, 'stores': 0}
+
+    def lookup(self, key):
+        """Return (key, depth, score, flag, move) for ``key`` or None, without touching the stats."""
+        index = 2 * (key % self.num_buckets)
+        keys = self.keys
+        if keys[index] != key:
+            index += 1
+            if keys[index] != key:
+                return None
+        data = self.data[index]
+        return (key, (data >> TT_DEPTH_SHIFT) & 255, (data >> TT_SCORE_SHIFT) - TT_SCORE_OFFSET,
+                (data >> TT_FLAG_SHIFT) & 3, _unpack_move(data & ((1 << TT_MOVE_BITS) - 1)))
+
+    def probe(self, key):
+        self.stats['probes'] += 1
+        entry = self.lookup(key)
+        if entry is not None:
+            self.stats['hits'] += 1
+        return entry
+
+    def store(self, key, depth, score, flag, move):
+        self.stats['stores'] += 1
+        index = 2 * (key % self.num_buckets)
+        data = (((int(score) + TT_SCORE_OFFSET) << TT_SCORE_SHIFT) | (min(depth, 255) << TT_DEPTH_SHIFT)
+                | (flag << TT_FLAG_SHIFT) | _pack_move(move))
+        deep_key = self.keys[index]
+        if deep_key is None or deep_key == key or depth >= (self.data[index] >> TT_DEPTH_SHIFT) & 255:
+            self.keys[index] = key
+            self.data[index] = data
+        else:
+            self.keys[index + 1] = key
+            self.data[index + 1] = data
+
+    def __len__(self):
+        return sum(1 for key in self.keys if key is not None)
+
+
+class SearchAborted(Exception):
+    """Raised inside minimax when the time or node budget is used up."""
+
 
 class ChessAI:
-    def __init__(self, board):
+    def __init__(self, board, hash_mb=16, check_eval=False, quiescence=True, book=None, tablebase=None,
+                 stop_event=None):
         self.board = board
+        # Optional threading/multiprocessing Event that stops the search from outside
+        self.stop_event = stop_event
+        self.use_quiescence = quiescence
+        # Optional book.OpeningBook / book.Tablebase, consulted before searching
+        self.book = book
+        self.tablebase = tablebase
+        self.book_hits = 0
+        self.tb_hits = 0
+        self.source = 'search'  # Where the last move came from
+        self.evaluator = IncrementalEvaluator(check=check_eval)
+        self._searching = False
+        # Kept for the whole game so later moves reuse earlier searches
+        self.tt = TranspositionTable(hash_mb)
+        self.nodes = 0
+        self.qnodes = 0
+        self.depth = 0
+        self.score = 0
+        self.pv = []
+        self.best_move = None
+        self.search_time = 0.0
+        # Called with an info dict after every completed iteration
+        self.on_iteration = None
+        self._root_ply = 0
+        self._root_moves = None
+        self._deadline = None
+        self._node_limit = None
+        self._can_abort = False
+        self._stop = False
+        # Move ordering state: two killer moves per ply and a history table
+        # indexed by side to move, from-square and to-square
+        self.killers = {}
+        self.history = [0] * (2 * 64 * 64)
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
 
-    def _evaluate_board(self):
-        piece_values = {
-            chess.PAWN: 1,
-            chess.KNIGHT: 3,
-            chess.BISHOP: 3,
-            chess.ROOK: 5,
-            chess.QUEEN: 9,
-            chess.KING: 1000
-        }
-        score = 0
-        for square in chess.SQUARES:
-            piece = self.board.piece_at(square)
-            if piece is not None:
-                value = piece_values.get(piece.piece_type, 0)
-                if piece.color == chess.WHITE:
-                    score += value
-                else:
-                    score -= value
+    @property
+    def stats(self):
+        stats = dict(self.tt.stats)
+        stats['nodes'] = self.nodes
+        stats['qnodes'] = self.qnodes
+        stats['depth'] = self.depth
+        stats['time'] = self.search_time
+        total_nodes = self.nodes + self.qnodes
+        stats['nps'] = int(total_nodes / self.search_time) if self.search_time else 0
+        stats['beta_cutoffs'] = self.beta_cutoffs
+        stats['first_move_cutoffs'] = self.first_move_cutoffs
+        stats['first_move_cutoff_rate'] = self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0
+        stats['tt_entries'] = len(self.tt)
+        stats['book_hits'] = self.book_hits
+        stats['tb_hits'] = self.tb_hits
+        stats['source'] = self.source
+        return stats
+
+    def _check_limits(self):
+        # Only give up once at least one iteration has produced a move
+        if not self._can_abort:
+            return
+        if self._stop:
+            raise SearchAborted()
+        nodes = self.nodes + self.qnodes
+        if self._node_limit is not None and nodes >= self._node_limit:
+            raise SearchAborted()
+        if nodes & 255 == 0:
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                raise SearchAborted()
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise SearchAborted()
+
+    def _ordered_moves(self, board, tt_move=None, pv_move=None):
+        """Order moves as PV, TT move, MVV-LVA captures, promotions, killers, history."""
+        ply = len(board.move_stack) - self._root_ply
+        killers = self.killers.get(ply, ())
+        history = self.history
+        offset = 4096 if board.turn == chess.WHITE else 0
+        scored = []
+        root_moves = self._root_moves if ply == 0 else None
+        for move in board.legal_moves:
+            if root_moves is not None and move not in root_moves:
+                continue
+            if move == pv_move:
+                order = ORDER_PV
+            elif move == tt_move:
+                order = ORDER_TT
+            elif board.is_capture(move):
+                # En passant leaves the target square empty; the victim is a pawn
+                victim = board.piece_type_at(move.to_square) or chess.PAWN
+                attacker = board.piece_type_at(move.from_square)
+                order = ORDER_CAPTURE + 10 * MVV_LVA_VALUES[victim] - MVV_LVA_VALUES[attacker]
+            elif move.promotion:
+                order = ORDER_PROMOTION + move.promotion
+            elif move in killers:
+                order = ORDER_KILLER - killers.index(move)
+            else:
+                order = history[offset + move.from_square * 64 + move.to_square]
+            scored.append((order, move))
+        scored.sort(key=itemgetter(0), reverse=True)
+        return [move for _, move in scored]
+
+    def _record_cutoff(self, board, move, depth, move_index):
+        self.beta_cutoffs += 1
+        if move_index == 0:
+            self.first_move_cutoffs += 1
+        if board.is_capture(move) or move.promotion:
+            return
+        ply = len(board.move_stack) - self._root_ply
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        offset = 4096 if board.turn == chess.WHITE else 0
+        self.history[offset + move.from_square * 64 + move.to_square] += depth * depth
+
+    def _extract_pv(self, board, depth):
+        pv = []
+        seen = set()
+        board = board.copy(stack=False)
+        while len(pv) < depth:
+            key = chess.polyglot.zobrist_hash(board)
+            # lookup() keeps PV walks out of the probe/hit stats
+            entry = self.tt.lookup(key)
+            if key in seen or entry is None or entry[4] is None or not board.is_legal(entry[4]):
+                break
+            seen.add(key)
+            pv.append(entry[4])
+            board.push(entry[4])
+        return pv
+
+    def _mate_score(self, board):
+        """Score for the side to move being checkmated, from White's point of view."""
+        score = MATE_SCORE - (len(board.move_stack) - self._root_ply)
+        return -score if board.turn == chess.WHITE else score
+
+    def _score_to_tt(self, score, board):
+        # Mate scores are stored relative to the node, not the root, so they
+        # stay correct when the position is reached at another ply
+        ply = len(board.move_stack) - self._root_ply
+        if score > MATE_BOUND:
+            return score + ply
+        if score < -MATE_BOUND:
+            return score - ply
+        return score
+
+    def _score_from_tt(self, score, board):
+        ply = len(board.move_stack) - self._root_ply
+        if score > MATE_BOUND:
+            return score - ply
+        if score < -MATE_BOUND:
+            return score + ply
         return score
 
-    def minimax(self, board, depth, maximizing_player, alpha=-math.inf, beta=math.inf):
-        if depth == 0 or board.is_game_over():
-            return self._evaluate_board(), None
+    def _evaluate_board(self, board=None):
+        # Inside a search the running total already describes the searched
+        # board; other callers (possibly on another thread) get a full recompute
+        if board is not None and self._searching:
+            return self.evaluator.score
+        return self.evaluator.full(self.board if board is None else board)
+
+    def minimax(self, board, depth, maximizing_player, alpha=-math.inf, beta=math.inf, on_pv=False):
+        """``on_pv`` is True while every move so far followed the previous iteration's PV."""
+        self.nodes += 1
+        self._check_limits()
+        outcome = board.outcome()
+        if outcome is not None:
+            if outcome.winner is None:
+                return 0, None  # Stalemate or another forced draw
+            return self._mate_score(board), None
+        if depth == 0:
+            if self.use_quiescence:
+                return self.quiescence(board, maximizing_player, alpha, beta), None
+            return self._evaluate_board(board), None
+
+        # Scores are always from White's point of view, so the bound types
+        # mean the same thing at maximizing and minimizing nodes.
+        key = chess.polyglot.zobrist_hash(board)
+        entry = self.tt.probe(key)
+        tt_move = entry[4] if entry is not None else None
+        # A root limited to some of its moves must neither use nor overwrite
+        # the table entry for the full position
+        restricted_root = self._root_moves is not None and len(board.move_stack) == self._root_ply
+        if entry is not None and entry[1] >= depth and not restricted_root:
+            _, _, tt_score, tt_flag, tt_move = entry
+            tt_score = self._score_from_tt(tt_score, board)
+            if tt_flag == EXACT:
+                self.tt.stats['cutoffs'] += 1
+                return tt_score, tt_move
+            if tt_flag == LOWERBOUND:
+                alpha = max(alpha, tt_score)
+            elif tt_flag == UPPERBOUND:
+                beta = min(beta, tt_score)
+            if beta <= alpha:
+                self.tt.stats['cutoffs'] += 1
+                return tt_score, tt_move
+        alpha_orig, beta_orig = alpha, beta
+        # Off the PV the previous iteration's move at this ply means nothing;
+        # the TT move covers those nodes
+        ply = len(board.move_stack) - self._root_ply
+        pv_move = self.pv[ply] if on_pv and ply < len(self.pv) else None
 
         best_move = None
         if maximizing_player:
             max_eval = -math.inf
-            for move in board.legal_moves:
-                board.push(move)
-                eval_score, _ = self.minimax(board, depth - 1, False, alpha, beta)
-                board.pop()
+            for index, move in enumerate(self._ordered_moves(board, tt_move, pv_move)):
+                self.evaluator.push(board, move)
+                eval_score, _ = self.minimax(board, depth - 1, False, alpha, beta, move == pv_move)
+                self.evaluator.pop(board)
                 if eval_score > max_eval:
                     max_eval = eval_score
                     best_move = move
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
+                    self._record_cutoff(board, move, depth, index)
                     break  # Prune
-            return max_eval, best_move
+            best_score = max_eval
         else:
             min_eval = math.inf
-            for move in board.legal_moves:
-                board.push(move)
-                eval_score, _ = self.minimax(board, depth - 1, True, alpha, beta)
-                board.pop()
+            for index, move in enumerate(self._ordered_moves(board, tt_move, pv_move)):
+                self.evaluator.push(board, move)
+                eval_score, _ = self.minimax(board, depth - 1, True, alpha, beta, move == pv_move)
+                self.evaluator.pop(board)
                 if eval_score < min_eval:
                     min_eval = eval_score
                     best_move = move
                 beta = min(beta, eval_score)
                 if beta <= alpha:
+                    self._record_cutoff(board, move, depth, index)
                     break  # Prune
-            return min_eval, best_move
+            best_score = min_eval
+
+        if best_score <= alpha_orig:
+            flag = UPPERBOUND
+        elif best_score >= beta_orig:
+            flag = LOWERBOUND
+        else:
+            flag = EXACT
+        if not restricted_root:
+            self.tt.store(key, depth, self._score_to_tt(best_score, board), flag, best_move)
+        return best_score, best_move
+
+    def _quiescence_moves(self, board):
+        """Captures plus quiet promotions, most valuable gain first."""
+        moves = []
+        for move in board.generate_legal_captures():
+            victim = board.piece_type_at(move.to_square) or chess.PAWN
+            gain = PIECE_VALUES[victim]
+            if move.promotion:
+                gain += PIECE_VALUES[move.promotion] - PIECE_VALUES[chess.PAWN]
+            attacker = board.piece_type_at(move.from_square)
+            moves.append((gain, -MVV_LVA_VALUES[attacker], move))
+        pawns = board.pieces_mask(chess.PAWN, board.turn)
+        pawns &= chess.BB_RANK_7 if board.turn == chess.WHITE else chess.BB_RANK_2
+        if pawns:
+            for move in board.generate_legal_moves(pawns, ~board.occupied & chess.BB_ALL):
+                if move.promotion:
+                    moves.append((PIECE_VALUES[move.promotion] - PIECE_VALUES[chess.PAWN], 0, move))
+        moves.sort(key=itemgetter(0, 1), reverse=True)
+        return moves
+
+    def quiescence(self, board, maximizing_player, alpha=-math.inf, beta=math.inf, qply=0):
+        """Extend captures and promotions past the horizon until the position is quiet."""
+        self.qnodes += 1
+        self._check_limits()
+        if board.is_check():
+            return self._quiescence_evasions(board, maximizing_player, alpha, beta, qply)
+        stand_pat = self._evaluate_board(board)
+        if qply >= QS_MAX_PLY:
+            return stand_pat
+
+        if maximizing_player:
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            best_score = stand_pat
+            for gain, _, move in self._quiescence_moves(board):
+                # Delta pruning: even winning this piece cannot reach alpha
+                if stand_pat + gain + DELTA_MARGIN <= alpha:
+                    continue
+                self.evaluator.push(board, move)
+                score = self.quiescence(board, False, alpha, beta, qply + 1)
+                self.evaluator.pop(board)
+                if score > best_score:
+                    best_score = score
+                alpha = max(alpha, score)
+                if beta <= alpha:
+                    break
+            return best_score
+        else:
+            if stand_pat <= alpha:
+                return stand_pat
+            beta = min(beta, stand_pat)
+            best_score = stand_pat
+            for gain, _, move in self._quiescence_moves(board):
+                if stand_pat - gain - DELTA_MARGIN >= beta:
+                    continue
+                self.evaluator.push(board, move)
+                score = self.quiescence(board, True, alpha, beta, qply + 1)
+                self.evaluator.pop(board)
+                if score < best_score:
+                    best_score = score
+                beta = min(beta, score)
+                if beta <= alpha:
+                    break
+            return best_score
+
+    def _quiescence_evasions(self, board, maximizing_player, alpha, beta, qply):
+        """In check there is no standing pat: every evasion is searched, and none means mate."""
+        evasions = list(board.legal_moves)
+        if not evasions:
+            return self._mate_score(board)
+        if qply >= QS_MAX_PLY:
+            return self._evaluate_board(board)
+        best_score = -math.inf if maximizing_player else math.inf
+        for move in evasions:
+            self.evaluator.push(board, move)
+            score = self.quiescence(board, not maximizing_player, alpha, beta, qply + 1)
+            self.evaluator.pop(board)
+            if maximizing_player:
+                best_score = max(best_score, score)
+                alpha = max(alpha, score)
+            else:
+                best_score = min(best_score, score)
+                beta = min(beta, score)
+            if beta <= alpha:
+                break
+        return best_score
+
+    def find_best_move(self, depth=3, time_limit=None, node_limit=None, root_moves=None,
+                       alpha=-math.inf, beta=math.inf):
+        """Search with iterative deepening up to ``depth`` plies.
+
+        ``time_limit`` (seconds) and ``node_limit`` cap the search; the move
+        from the last fully completed iteration is returned. ``root_moves``
+        limits the search to some of the legal moves and ``alpha``/``beta``
+        narrow the root window (scores outside it are only bounds).
+        """
+        self._stop = False
+        return self._search(self.board, depth, time_limit, node_limit, root_moves, alpha, beta)
+
+    def start_search(self, depth=3, time_limit=None, node_limit=None, root_moves=None):
+        """Like find_best_move, but runs on a background thread.
+
+        The search works on a copy of the board, so the caller can keep
+        drawing ``self.board`` while it runs. Returns a SearchHandle.
+        """
+        self._stop = False
+        return SearchHandle(self, self.board.copy(), depth, time_limit, node_limit, root_moves)
+
+    def expected_reply(self):
+        """The opponent's reply predicted by the last search's principal variation."""
+        if len(self.pv) > 1 and self.board.is_legal(self.pv[1]):
+            return self.pv[1]
+        return None
+
+    def start_ponder(self, move, depth=3):
+        """Search the position after the expected reply ``move`` while the opponent thinks.
+
+        The search has no time limit. Call ponderhit() on the returned handle
+        if ``move`` is played; otherwise cancel() it; whatever it stored in
+        the transposition table still helps the real search.
+        """
+        board = self.board.copy()
+        board.push(move)
+        self._stop = False
+        return SearchHandle(self, board, depth, None, None)
+
+    def stop(self):
+        """Ask a running search to return its current best move."""
+        self._stop = True
+
+    def _probe_book_and_tablebase(self, board):
+        """Take the move from the opening book or tablebases if they know the position."""
+        if self.book is not None:
+            move = self.book.probe(board)
+            if move is not None and board.is_legal(move):
+                self.book_hits += 1
+                self.source = 'book'
+                self.best_move = move
+                self.pv = [move]
+                self.score = self._evaluate_board(board)
+                return True
+        if self.tablebase is not None:
+            result = self.tablebase.probe(board)
+            if result is not None:
+                move, wdl = result
+                self.tb_hits += 1
+                self.source = 'tablebase'
+                self.best_move = move
+                self.pv = [move]
+                self.score = self.tablebase.score(board, wdl)
+                return True
+        return False
+
+    def _search(self, board, depth, time_limit, node_limit, root_moves=None, alpha=-math.inf, beta=math.inf):
+        maximizing = board.turn == chess.WHITE
+        self.nodes = 0
+        self.qnodes = 0
+        self.depth = 0
+        self.pv = []
+        self.best_move = None
+        self.killers = {}
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        # Age the history table so older games/moves fade out
+        self.history = [value // 2 for value in self.history]
+        self._root_ply = len(board.move_stack)
+        start = time.perf_counter()
+        self.search_time = 0.0
+        self.source = 'search'
+        if root_moves is None and self._probe_book_and_tablebase(board):
+            self.search_time = time.perf_counter() - start
+            return self.best_move
+        self._deadline = start + time_limit if time_limit is not None else None
+        self._node_limit = node_limit
+        self._root_moves = root_moves
+        self._can_abort = False
+        self.evaluator.reset(board)
+        self._searching = True
+        try:
+            for current_depth in range(1, depth + 1):
+                score, move = self.minimax(board, current_depth, maximizing, alpha, beta, on_pv=True)
+                if move is None:
+                    break
+                self.best_move = move
+                self.score = score
+                self.depth = current_depth
+                self.pv = self._extract_pv(board, current_depth)
+                if not self.pv or self.pv[0] != move:
+                    self.pv = [move]
+                self.search_time = time.perf_counter() - start
+                if self.on_iteration is not None:
+                    self.on_iteration({
+                        'depth': current_depth,
+                        'score': score,
+                        'nodes': self.nodes,
+                        'qnodes': self.qnodes,
+                        'time': self.search_time,
+                        'pv': list(self.pv),
+                    })
+                self._can_abort = True
+                if self._stop or (self._deadline is not None and time.perf_counter() >= self._deadline):
+                    break
+        except SearchAborted:
+            # Unwind the moves pushed by the interrupted iteration
+            while len(board.move_stack) > self._root_ply:
+                self.evaluator.pop(board)
+        finally:
+            self.search_time = time.perf_counter() - start
+            self._can_abort = False
+            self._root_moves = None
+            self._searching = False
+        return self.best_move
+
+
+class SearchHandle:
+    """A ChessAI search running on a daemon thread.
+
+    CPython hands the GIL back and forth between the search and the caller
+    every few milliseconds, so a pygame loop can keep pumping events and
+    drawing frames while the engine thinks.
+    """
+
+    def __init__(self, ai, board, depth, time_limit, node_limit, root_moves=None):
+        self.ai = ai
+        self.cancelled = False
+        self.started = time.perf_counter()
+        self._result = None
+        self._thread = threading.Thread(target=self._run, args=(board, depth, time_limit, node_limit, root_moves),
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self, board, depth, time_limit, node_limit, root_moves):
+        self._result = self.ai._search(board, depth, time_limit, node_limit, root_moves)
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def poll(self):
+        """Best move from the last completed iteration so far (None before depth 1 finishes)."""
+        if self.cancelled:
+            return None
+        return self._result if self.done() else self.ai.best_move
+
+    def stop(self):
+        """End the search early and return its current best move."""
+        self.ai.stop()
+        return self.result()
+
+    def ponderhit(self, time_limit):
+        """The pondered move was played: give the search a normal time budget.
+
+        Time already spent pondering counts towards ``time_limit``, so a long
+        ponder can make the reply instant.
+        """
+        self.ai._deadline = self.started + time_limit
+
+    def cancel(self):
+        """End the search and discard its result, e.g. when the window closes."""
+        self.cancelled = True
+        self.ai.stop()
+        self._thread.join()
 
-    def find_best_move(self, depth=3):
-        _, best_move = self.minimax(self.board, depth, False)
-        return best_move
\ No newline at end of file
+    def result(self, timeout=None):
+        self._thread.join(timeout)
+        if self.cancelled or not self.done():
+            return None
+        return self._result
@@ -0,0 +1,129 @@
+"""Headless batch analysis of PGN or EPD files.
+
+Positions are streamed from the input file one at a time and analyzed by a
+pool of worker processes, each with its own ChessAI. Results are written as
+one JSON object per line in the order they complete, so very large files
+never have to fit in memory.
+
+    python analyze.py games.pgn --depth 4 --workers 8 --output results.jsonl
+    python analyze.py suite.epd --time 0.5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import chess
+import chess.pgn
+
+from epd import read_epd
+from uci import MAX_DEPTH
+from workers import init_worker, worker_ai
+
+# Depth used when neither --depth nor --time is given; with only --time the
+# search deepens up to uci.MAX_DEPTH so the clock decides
+DEFAULT_DEPTH = 4
+
+
+def analyze_position(position_id, fen, depth, time_limit):
+    ai = worker_ai()
+    ai.board = chess.Board(fen)
+    start = time.perf_counter()
+    move = ai.find_best_move(depth=depth, time_limit=time_limit)
+    elapsed = time.perf_counter() - start
+    return {
+        'id': position_id,
+        'fen': fen,
+        'best_move': move.uci() if move else None,
+        'score': ai.score if move else ai._evaluate_board(),
+        'depth': ai.depth,
+        'nodes': ai.nodes,
+        'qnodes': ai.qnodes,
+        'time': round(elapsed, 4),
+    }
+
+
+def read_pgn(handle, final_only=False):
+    game_number = 0
+    while True:
+        game = chess.pgn.read_game(handle)
+        if game is None:
+            return
+        game_number += 1
+        board = game.board()
+        if final_only:
+            for move in game.mainline_moves():
+                board.push(move)
+            if not board.is_game_over():
+                yield f"{game_number}:{board.ply()}", board.fen()
+            continue
+        for move in game.mainline_moves():
+            if not board.is_game_over():
+                yield f"{game_number}:{board.ply()}", board.fen()
+            board.push(move)
+        if not board.is_game_over():
+            yield f"{game_number}:{board.ply()}", board.fen()
+
+
+def read_positions(path, final_only=False):
+    with open(path, encoding='utf-8', errors='replace') as handle:
+        if path.lower().endswith('.pgn'):
+            yield from read_pgn(handle, final_only)
+        else:
+            for position_id, board, _ in read_epd(handle, path):
+                yield position_id, board.fen()
+
+
+def run(positions, output, depth, time_limit, workers, hash_mb):
+    # Only a few tasks per worker are queued at a time so the reader never
+    # runs far ahead of the pool
+    max_pending = workers * 4
+    pending = set()
+    count = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(hash_mb,)) as pool:
+        for position_id, fen in positions:
+            pending.add(pool.submit(analyze_position, position_id, fen, depth, time_limit))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                count += _write_results(done, output)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            count += _write_results(done, output)
+    elapsed = time.perf_counter() - start
+    print(f"Analyzed {count} positions in {elapsed:.1f}s", file=sys.stderr)
+
+
+def _write_results(futures, output):
+    for future in futures:
+        output.write(json.dumps(future.result()) + '\n')
+    output.flush()
+    return len(futures)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze every position of a PGN or EPD file with ChessAI")
+    parser.add_argument('input', help="PGN (.pgn) or EPD file")
+    parser.add_argument('--depth', type=int, default=None,
+                        help=f"maximum search depth (default {DEFAULT_DEPTH}, or unlimited with --time)")
+    parser.add_argument('--time', type=float, default=None, help="time budget per position in seconds")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--hash', type=int, default=16, help="transposition table size per worker in MB")
+    parser.add_argument('--final-only', action='store_true', help="PGN: only analyze the final position of each game")
+    parser.add_argument('--output', '-o', default='-', help="JSONL output file (default: stdout)")
+    args = parser.parse_args(argv)
+    if args.depth is None:
+        args.depth = MAX_DEPTH if args.time is not None else DEFAULT_DEPTH
+
+    positions = read_positions(args.input, args.final_only)
+    if args.output == '-':
+        run(positions, sys.stdout, args.depth, args.time, args.workers, args.hash)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            run(positions, output, args.depth, args.time, args.workers, args.hash)
+
+
+if __name__ == '__main__':
+    main()
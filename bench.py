@@ -0,0 +1,179 @@
+"""Search benchmark for ChessAI.
+
+Runs a fixed set of reference positions to a fixed depth and reports nodes,
+NPS, time-to-depth, effective branching factor and the chosen move. Every
+position gets a fresh engine, so node counts are reproducible between runs.
+
+    python bench.py --depth 4
+    python bench.py --json new.json --compare baseline.json
+    python bench.py --profile cprofile --position kiwipete
+"""
+import argparse
+import json
+import sys
+
+import chess
+
+from ai import ChessAI
+from epd import read_epd_file
+
+BENCH_VERSION = 1
+
+# (name, EPD); "bm" marks the expected move of the tactical positions
+BENCH_POSITIONS = [
+    ("startpos", "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -"),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq -"),
+    ("endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - -"),
+    ("WAC.001", "2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PP3PPP/R4RK1 w - - bm Qg6;"),
+    ("WAC.002", "8/7p/5k2/5p2/p1p2P2/Pr1pPK2/1P1R3P/8 b - - bm Rxb2;"),
+    ("WAC.003", "5rk1/1ppb3p/p1pb4/6q1/3P1p1r/2P1R2P/PP1BQ1P1/5RKN w - - bm Rg3;"),
+    ("WAC.004", "r1bq2rk/pp3pbp/2p1p1pQ/7P/3P4/2PB1N2/PP3PPR/2KR4 w - - bm Qxh7+;"),
+    ("WAC.005", "5k2/6pp/p1qN4/1p1p4/3P4/2PKP2Q/PP3r2/3R4 b - - bm Qc4+;"),
+]
+
+
+def builtin_positions():
+    return [(name, *chess.Board.from_epd(epd)) for name, epd in BENCH_POSITIONS]
+
+
+def bench_position(name, board, operations, depth, hash_mb):
+    board = board.copy()
+    ai = ChessAI(board, hash_mb=hash_mb)
+    iterations = []
+    ai.on_iteration = iterations.append
+    move = ai.find_best_move(depth=depth)
+
+    previous_nodes = None
+    for info in iterations:
+        nodes = info['nodes'] + info['qnodes']
+        info['ebf'] = round(nodes / previous_nodes, 2) if previous_nodes else None
+        info['pv'] = [pv_move.uci() for pv_move in info['pv']]
+        info['time'] = round(info['time'], 4)
+        previous_nodes = nodes
+
+    stats = ai.stats
+    result = {
+        'name': name,
+        'fen': board.fen(),
+        'best_move': move.uci() if move else None,
+        'score': ai.score,
+        'nodes': stats['nodes'],
+        'qnodes': stats['qnodes'],
+        'time': round(stats['time'], 4),
+        'nps': stats['nps'],
+        'first_move_cutoff_rate': round(stats['first_move_cutoff_rate'], 4),
+        'iterations': iterations,
+    }
+    if 'bm' in operations:
+        result['expected'] = [board.san(bm) for bm in operations['bm']]
+        result['solved'] = move in operations['bm']
+    return result
+
+
+def run_bench(positions, depth, hash_mb):
+    results = []
+    for name, board, operations in positions:
+        result = bench_position(name, board, operations, depth, hash_mb)
+        results.append(result)
+        ebf = result['iterations'][-1]['ebf'] if result['iterations'] else None
+        solved = ''
+        if 'solved' in result:
+            solved = f"  bm {'/'.join(result['expected'])}: {'ok' if result['solved'] else 'MISSED'}"
+        print(f"{name:<10} depth {depth}  nodes {result['nodes'] + result['qnodes']:>9}  "
+              f"time {result['time']:7.3f}s  nps {result['nps']:>7}  ebf {ebf}  "
+              f"best {result['best_move']}{solved}")
+        for info in result['iterations']:
+            print(f"    depth {info['depth']}: {info['time']:7.3f}s  "
+                  f"nodes {info['nodes'] + info['qnodes']:>9}  score {info['score']}  pv {' '.join(info['pv'])}")
+
+    total_nodes = sum(result['nodes'] + result['qnodes'] for result in results)
+    total_time = sum(result['time'] for result in results)
+    summary = {
+        'nodes': total_nodes,
+        'time': round(total_time, 4),
+        'nps': int(total_nodes / total_time) if total_time else 0,
+    }
+    print(f"Total: {summary['nodes']} nodes in {summary['time']:.3f}s ({summary['nps']} nps)")
+    return {'version': BENCH_VERSION, 'depth': depth, 'positions': results, 'total': summary}
+
+
+def compare(report, baseline, max_slowdown):
+    """Print differences against a baseline report; return False on a regression."""
+    ok = True
+    old_positions = {result['name']: result for result in baseline['positions']}
+    for result in report['positions']:
+        old = old_positions.get(result['name'])
+        if old is None:
+            continue
+        nodes = result['nodes'] + result['qnodes']
+        old_nodes = old['nodes'] + old['qnodes']
+        if nodes != old_nodes or result['best_move'] != old['best_move']:
+            print(f"{result['name']}: nodes {old_nodes} -> {nodes}, best {old['best_move']} -> {result['best_move']}")
+    old_time = baseline['total']['time']
+    new_time = report['total']['time']
+    change = (new_time - old_time) / old_time if old_time else 0.0
+    print(f"Total time {old_time:.3f}s -> {new_time:.3f}s ({change:+.1%}), "
+          f"nps {baseline['total']['nps']} -> {report['total']['nps']}")
+    if change > max_slowdown:
+        print(f"Regression: slower by more than {max_slowdown:.0%}")
+        ok = False
+    return ok
+
+
+def profile_search(name, board, operations, depth, hash_mb, profiler):
+    """Run a single benchmark search under cProfile or pyinstrument."""
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            sys.exit("pyinstrument is not installed (pip install pyinstrument)")
+        profile = Profiler()
+        profile.start()
+        bench_position(name, board, operations, depth, hash_mb)
+        profile.stop()
+        print(profile.output_text(unicode=True, color=False))
+    else:
+        import cProfile
+        import pstats
+        profile = cProfile.Profile()
+        profile.runcall(bench_position, name, board, operations, depth, hash_mb)
+        pstats.Stats(profile).sort_stats('cumulative').print_stats(25)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ChessAI search speed")
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--hash', type=int, default=16, help="transposition table size in MB")
+    parser.add_argument('--epd', help="use the positions from this EPD file instead of the built-in set")
+    parser.add_argument('--position', help="only run the position with this name")
+    parser.add_argument('--json', help="write the results as JSON to this file")
+    parser.add_argument('--compare', help="baseline JSON to compare against; exits 1 on a regression")
+    parser.add_argument('--max-slowdown', type=float, default=0.10,
+                        help="allowed total time increase against the baseline (default 0.10)")
+    parser.add_argument('--profile', choices=['cprofile', 'pyinstrument'],
+                        help="profile a single search instead of running the benchmark")
+    args = parser.parse_args(argv)
+
+    positions = list(read_epd_file(args.epd)) if args.epd else builtin_positions()
+    if args.position:
+        positions = [position for position in positions if position[0] == args.position]
+        if not positions:
+            sys.exit(f"Unknown position: {args.position}")
+
+    if args.profile:
+        profile_search(*positions[0], args.depth, args.hash, args.profile)
+        return
+
+    report = run_bench(positions, args.depth, args.hash)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        if not compare(report, baseline, args.max_slowdown):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
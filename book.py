@@ -0,0 +1,86 @@
+"""Opening book and endgame tablebase lookups that let ChessAI skip the search."""
+import chess
+import chess.polyglot
+import chess.syzygy
+
+# Score reported for a tablebase win, in centipawns from the winner's side
+TB_WIN_SCORE = 10000
+
+
+class OpeningBook:
+    """A Polyglot ``.bin`` opening book.
+
+    python-chess memory-maps the file and binary-searches its sorted entries
+    for the position's Zobrist key, so even large books open instantly and
+    cost no memory up front.
+    """
+
+    def __init__(self, path, random_choice=False):
+        self.path = path
+        self.random_choice = random_choice
+        self.reader = chess.polyglot.open_reader(path)
+
+    def probe(self, board):
+        """Book move for ``board``, or None when the position is not in the book."""
+        try:
+            if self.random_choice:
+                return self.reader.weighted_choice(board).move
+            return self.reader.find(board).move
+        except IndexError:
+            return None
+
+    def close(self):
+        self.reader.close()
+
+
+class Tablebase:
+    """Syzygy endgame tablebases read from local directories."""
+
+    def __init__(self, path, max_pieces=5):
+        self.path = path
+        self.max_pieces = max_pieces
+        self.tablebase = chess.syzygy.open_tablebase(path)
+
+    def probe(self, board):
+        """Return (move, wdl) for the best tablebase move, or None.
+
+        ``wdl`` is 2 for a win, 0 for a draw and -2 for a loss from the side
+        to move's point of view (1/-1 are cursed wins/blessed losses).
+        """
+        if chess.popcount(board.occupied) > self.max_pieces or board.castling_rights:
+            return None
+        best_key = None
+        best = None
+        for move in board.legal_moves:
+            board.push(move)
+            try:
+                mate = board.is_checkmate()
+                wdl = -self.tablebase.probe_wdl(board)
+                dtz = abs(self.tablebase.probe_dtz(board))
+            except KeyError:
+                # Missing table for this material
+                return None
+            finally:
+                board.pop()
+            # Win as fast as possible, lose as slowly as possible
+            if wdl > 0:
+                key = (wdl, mate, -dtz)
+            else:
+                key = (wdl, False, dtz)
+            if best_key is None or key > best_key:
+                best_key = key
+                best = (move, wdl)
+        return best
+
+    def score(self, board, wdl):
+        """Convert a probe result to a score from White's point of view."""
+        if wdl == 2:
+            score = TB_WIN_SCORE
+        elif wdl == -2:
+            score = -TB_WIN_SCORE
+        else:
+            score = 0
+        return score if board.turn == chess.WHITE else -score
+
+    def close(self):
+        self.tablebase.close()
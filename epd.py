@@ -0,0 +1,30 @@
+"""Streaming EPD reader shared by the analysis, benchmark and self-play tools."""
+import sys
+
+import chess
+
+
+def read_epd(handle, source='EPD'):
+    """Yield (id, board, operations) for every position in an open EPD file.
+
+    Blank lines and ``#`` comments are skipped. Lines that do not parse are
+    reported on stderr and skipped, so one bad line does not stop a long
+    run. The id is the ``id`` operation, or the line number when there is
+    none.
+    """
+    for line_number, line in enumerate(handle, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            board, operations = chess.Board.from_epd(line)
+        except ValueError as e:
+            print(f"Skipping {source} line {line_number}: {e}", file=sys.stderr)
+            continue
+        yield str(operations.get('id', line_number)), board, operations
+
+
+def read_epd_file(path):
+    """Like read_epd, but opens ``path`` and closes it when the positions run out."""
+    with open(path, encoding='utf-8', errors='replace') as handle:
+        yield from read_epd(handle, path)
@@ -1,27 +1,147 @@
+import time
+IMPORT_TIME = time.time()  # Fallback when the process start time is unknown
+
+import os
+import sys
 import chess
-import pygame
 from ai import ChessAI
-from gui import ChessGUI
+from book import OpeningBook, Tablebase
+
+# pygame and gui are imported only when a game window is created, so tools
+# that import this module for the engine never load pygame
+
+# The AI deepens its search until either limit is reached
+AI_MAX_DEPTH = 5
+AI_TIME_LIMIT = 2.0  # seconds per move
+FRAME_RATE = 30  # frames per second while the AI is thinking
+
+# Optional Polyglot book and Syzygy tables, looked up next to the game
+BOOK_FILE = 'book.bin'
+SYZYGY_DIR = 'syzygy'
+
+
+def process_start_time():
+    """Wall-clock time this process was created, or None where it cannot be read.
+
+    Unlike a timestamp taken at import, this includes interpreter start-up
+    and, for the frozen build, the PyInstaller bootloader.
+    """
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+            creation, exit_time, kernel_time, user_time = (wintypes.FILETIME() for _ in range(4))
+            kernel32 = ctypes.windll.kernel32
+            if not kernel32.GetProcessTimes(kernel32.GetCurrentProcess(), ctypes.byref(creation),
+                                            ctypes.byref(exit_time), ctypes.byref(kernel_time),
+                                            ctypes.byref(user_time)):
+                return None
+            # FILETIME counts 100 ns intervals since 1601-01-01
+            ticks = (creation.dwHighDateTime << 32) | creation.dwLowDateTime
+            return ticks / 10_000_000 - 11_644_473_600
+        if os.path.exists('/proc/self/stat'):
+            with open('/proc/self/stat') as handle:
+                # Field 22 (starttime) counts clock ticks since boot; the
+                # command name in field 2 may contain spaces
+                start_ticks = int(handle.read().rsplit(')', 1)[1].split()[19])
+            with open('/proc/uptime') as handle:
+                uptime = float(handle.read().split()[0])
+            return time.time() - uptime + start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, AttributeError, IndexError):
+        pass
+    return None
+
+
+def load_book_and_tablebase():
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    opening_book = None
+    tablebase = None
+    book_path = os.path.join(base_path, BOOK_FILE)
+    if os.path.isfile(book_path):
+        print(f"Using opening book {book_path}")
+        opening_book = OpeningBook(book_path)
+    syzygy_path = os.path.join(base_path, SYZYGY_DIR)
+    if os.path.isdir(syzygy_path):
+        print(f"Using Syzygy tablebases in {syzygy_path}")
+        tablebase = Tablebase(syzygy_path)
+    return opening_book, tablebase
 
 class ChessGame:
-    def __init__(self):
+    def __init__(self, show_fps=False):
         self.board = chess.Board()
-        self.ai = ChessAI(self.board)
-        self.gui = ChessGUI()
+        opening_book, tablebase = load_book_and_tablebase()
+        self.ai = ChessAI(self.board, book=opening_book, tablebase=tablebase)
+        from gui import ChessGUI
+        self.gui = ChessGUI(show_fps=show_fps)
         self.score = 0
         self.white_score = 0
         self.black_score = 0
         self.move_history = []
+        # (predicted human move, search handle) while pondering
+        self.ponder = None
     
+    def run_ai_search(self):
+        """Run the AI search in the background while keeping the window responsive.
+
+        Returns the finished search handle, or None if the window was closed.
+        """
+        import pygame
+        handle = None
+        if self.ponder is not None:
+            predicted_move, ponder_handle = self.ponder
+            self.ponder = None
+            if self.board.move_stack and self.board.peek() == predicted_move:
+                print(f"Ponder hit on {predicted_move.uci()}")
+                ponder_handle.ponderhit(AI_TIME_LIMIT)
+                handle = ponder_handle
+            else:
+                ponder_handle.cancel()
+        if handle is None:
+            handle = self.ai.start_search(depth=AI_MAX_DEPTH, time_limit=AI_TIME_LIMIT)
+        clock = pygame.time.Clock()
+        while not handle.done():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    handle.cancel()
+                    return None
+            self.gui.update_display(self.board, self.score, self.white_score, self.black_score, self.board.turn, self.move_history)
+            clock.tick(FRAME_RATE)
+        return handle
+
+    def start_pondering(self):
+        """Search the AI's answer to the expected human move while the human thinks."""
+        if self.ponder is not None:
+            return
+        predicted_move = self.ai.expected_reply()
+        if predicted_move is not None:
+            self.ponder = (predicted_move, self.ai.start_ponder(predicted_move, depth=AI_MAX_DEPTH))
+
+    def stop_pondering(self):
+        if self.ponder is not None:
+            self.ponder[1].cancel()
+            self.ponder = None
+
     def run(self):
+        import pygame
         print("Starting game loop...")
         running = True
+        first_frame = True
         while running and not self.board.is_game_over():
             self.gui.draw_board(self.board)
             self.gui.update_display(self.board, self.score, self.white_score, self.black_score, self.board.turn, self.move_history)
-            pygame.display.flip()
+            if first_frame:
+                first_frame = False
+                start = process_start_time()
+                since = "process start"
+                if start is None:
+                    start, since = IMPORT_TIME, "game.py import"
+                print(f"Time to first frame (since {since}): {(time.time() - start) * 1000:.0f} ms")
 
             if self.board.turn == chess.WHITE:
+                self.start_pondering()
                 move = self.gui.get_human_move(self.board)
                 if move is None:
                     for event in pygame.event.get():
@@ -41,7 +161,11 @@ class ChessGame:
                 else:
                     print(f"Invalid move: {move.uci()}")
             else:
-                ai_move = self.ai.find_best_move()
+                handle = self.run_ai_search()
+                if handle is None:
+                    running = False  # Window closed while the AI was thinking
+                    break
+                ai_move = handle.result()
                 if ai_move:
                     captured_piece = self.board.piece_at(ai_move.to_square)
                     if captured_piece:
@@ -52,6 +176,8 @@ class ChessGame:
                     self.board.push(ai_move)
                     self.score = self.ai._evaluate_board()
 
+        self.stop_pondering()
+
         # Display game result
         result = "Game Over: " + self.board.result()
         self.gui.show_game_result(result)
@@ -59,5 +185,5 @@ class ChessGame:
         pygame.quit()
 
 if __name__ == "__main__":
-    game = ChessGame()
+    game = ChessGame(show_fps='--fps' in sys.argv)
     game.run()
\ No newline at end of file
@@ -2,10 +2,29 @@ import pygame
 import chess
 import os
 import sys
+import time
+
+# Order of the pieces in the cached sprite sheet
+PIECE_FILES = {
+    'P': 'white_pawn.png', 'N': 'white_knight.png', 'B': 'white_bishop.png',
+    'R': 'white_rook.png', 'Q': 'white_queen.png', 'K': 'white_king.png',
+    'p': 'black_pawn.png', 'n': 'black_knight.png', 'b': 'black_bishop.png',
+    'r': 'black_rook.png', 'q': 'black_queen.png', 'k': 'black_king.png'
+}
+
+
+def sprite_cache_dir():
+    """Per-user cache directory; the PyInstaller bundle itself is read-only."""
+    root = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(root, 'ChessAI')
+
 
 class ChessGUI:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, show_fps=False):
+        # Only the display and font modules are needed; pygame.init() would
+        # also start audio, joystick and other subsystems
+        pygame.display.init()
+        pygame.font.init()
         print("Pygame initialized...")
         self.screen_size = 600
         self.square_size = self.screen_size // 8
@@ -19,6 +38,18 @@ class ChessGUI:
         self.error_message = None
         self.error_timer = 0
 
+        # Rendering caches: only changed squares and panels are redrawn and
+        # pushed to the display with pygame.display.update(rects)
+        self.board_surface = self._build_board_surface()
+        self._text_cache = {}
+        self._targets_key = None
+        self._targets = frozenset()
+        self._dirty = []
+        self.invalidate()
+        self.show_fps = show_fps
+        self.clock = pygame.time.Clock()
+        self.frame_time = 0.0
+
         # Determine base path for piece images
         if getattr(sys, 'frozen', False):
             base_path = sys._MEIPASS
@@ -27,83 +58,159 @@ class ChessGUI:
             base_path = os.path.dirname(__file__)
             print(f"Running from script, base path: {base_path}")
 
-        # Load piece images
-        self.piece_images = {}
-        piece_files = {
-            'P': 'white_pawn.png', 'N': 'white_knight.png', 'B': 'white_bishop.png',
-            'R': 'white_rook.png', 'Q': 'white_queen.png', 'K': 'white_king.png',
-            'p': 'black_pawn.png', 'n': 'black_knight.png', 'b': 'black_bishop.png',
-            'r': 'black_rook.png', 'q': 'black_queen.png', 'k': 'black_king.png'
-        }
-        for symbol, filename in piece_files.items():
-            image_path = os.path.join(base_path, 'pieces', filename)
+        self.piece_images = self._load_piece_images(os.path.join(base_path, 'pieces'))
+
+    def _load_piece_images(self, pieces_dir):
+        """Load the 12 piece sprites scaled to the square size.
+
+        Scaled sprites are kept in one sprite-sheet PNG per square size, so
+        later launches read a single file and skip the scaling.
+        """
+        size = self.square_size
+        sheet_path = os.path.join(sprite_cache_dir(), f"pieces_{size}.png")
+        sources = [os.path.join(pieces_dir, filename) for filename in PIECE_FILES.values()]
+        try:
+            if os.path.getmtime(sheet_path) >= max(os.path.getmtime(path) for path in sources):
+                sheet = pygame.image.load(sheet_path).convert_alpha()
+                if sheet.get_size() == (size * len(PIECE_FILES), size):
+                    return {symbol: sheet.subsurface((i * size, 0, size, size))
+                            for i, symbol in enumerate(PIECE_FILES)}
+        except (OSError, ValueError, pygame.error):
+            pass  # No usable cache yet; build it below
+
+        piece_images = {}
+        sheet = pygame.Surface((size * len(PIECE_FILES), size), pygame.SRCALPHA)
+        for i, (symbol, image_path) in enumerate(zip(PIECE_FILES, sources)):
             if os.path.exists(image_path):
-                self.piece_images[symbol] = pygame.image.load(image_path).convert_alpha()
-                self.piece_images[symbol] = pygame.transform.scale(self.piece_images[symbol], (self.square_size, self.square_size))
+                image = pygame.transform.scale(pygame.image.load(image_path).convert_alpha(), (size, size))
+                piece_images[symbol] = image
+                sheet.blit(image, (i * size, 0))
             else:
                 print(f"Warning: {image_path} not found")
+        if len(piece_images) == len(PIECE_FILES):
+            try:
+                os.makedirs(os.path.dirname(sheet_path), exist_ok=True)
+                pygame.image.save(sheet, sheet_path)
+            except (OSError, pygame.error) as e:
+                print(f"Could not write sprite cache {sheet_path}: {e}")
+        return piece_images
 
-    def draw_board(self, board):
-        print("Drawing board...")
-        self.screen.fill((0, 0, 0), (0, 0, self.screen_size, self.screen_size))
+    def _build_board_surface(self):
+        """Pre-render the plain chessboard once; squares are restored from it."""
+        surface = pygame.Surface((self.screen_size, self.screen_size))
         for square in chess.SQUARES:
             rank = chess.square_rank(square)
             file = chess.square_file(square)
             color = (238, 238, 210) if (rank + file) % 2 == 0 else (118, 150, 86)
+            pygame.draw.rect(surface, color, self._square_rect(square))
+        return surface
 
-            # Highlight selected square and legal moves
-            if self.selected_square == square:
-                color = (186, 202, 68)  # Selected square
-            elif self.selected_square is not None:
-                # Check legal moves for the selected piece
-                piece = board.piece_at(self.selected_square)
-                if piece and board.is_legal(chess.Move(self.selected_square, square)):
-                    color = (150, 200, 255)  # Legal move highlight
-
-            pygame.draw.rect(self.screen, color,
-                            (file * self.square_size,
-                             (7 - rank) * self.square_size,
-                             self.square_size,
-                             self.square_size))
-
-        print("Drawing pieces...")
+    def _square_rect(self, square):
+        return pygame.Rect(chess.square_file(square) * self.square_size,
+                           (7 - chess.square_rank(square)) * self.square_size,
+                           self.square_size, self.square_size)
+
+    def _render_text(self, font, text, color):
+        """Render text through a cache, since the same strings are drawn every frame."""
+        key = (id(font), text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) > 512:
+                self._text_cache.clear()
+            surface = font.render(text, True, color)
+            self._text_cache[key] = surface
+        return surface
+
+    def _legal_targets(self, board):
+        # Recomputed only when the selection or the position changes
+        key = (self.selected_square, len(board.move_stack), board.peek() if board.move_stack else None)
+        if key != self._targets_key:
+            self._targets_key = key
+            if self.selected_square is None:
+                self._targets = frozenset()
+            else:
+                self._targets = frozenset(move.to_square for move in board.legal_moves
+                                          if move.from_square == self.selected_square)
+        return self._targets
+
+    def invalidate(self):
+        """Force a full redraw, e.g. after something was drawn over the board."""
+        self._square_state = [None] * 64
+        self._scoreboard_state = None
+        self._dirty.append(self.screen.get_rect())
+
+    def draw_board(self, board):
+        targets = self._legal_targets(board)
         for square in chess.SQUARES:
             piece = board.piece_at(square)
+            symbol = piece.symbol() if piece else None
+            if self.selected_square == square:
+                highlight = (186, 202, 68)  # Selected square
+            elif square in targets:
+                highlight = (150, 200, 255)  # Legal move highlight
+            else:
+                highlight = None
+
+            # Only squares whose piece or highlight changed are redrawn
+            state = (symbol, highlight)
+            if self._square_state[square] == state:
+                continue
+            self._square_state[square] = state
+
+            rect = self._square_rect(square)
+            if highlight:
+                self.screen.fill(highlight, rect)
+            else:
+                self.screen.blit(self.board_surface, rect, rect)
             if piece:
-                rank = chess.square_rank(square)
-                file = chess.square_file(square)
-                symbol = piece.symbol()
                 image = self.piece_images.get(symbol)
                 if image:
-                    self.screen.blit(image, (file * self.square_size, (7 - rank) * self.square_size))
+                    self.screen.blit(image, rect)
                 else:
-                    text = self.font.render(symbol, True, (0, 0, 0) if piece.color == chess.BLACK else (255, 255, 255))
-                    text_rect = text.get_rect(center=((file + 0.5) * self.square_size, (7.5 - rank) * self.square_size))
-                    self.screen.blit(text, text_rect)
+                    text = self._render_text(self.font, symbol, (0, 0, 0) if piece.color == chess.BLACK else (255, 255, 255))
+                    self.screen.blit(text, text.get_rect(center=rect.center))
+            self._dirty.append(rect)
 
     def draw_scoreboard(self, white_score, black_score, turn, move_history):
-        scoreboard_rect = (self.screen_size, 0, self.scoreboard_width, self.screen_size)
+        error = self.error_message if self.error_message and self.error_timer > 0 else None
+        if self.error_timer > 0:
+            self.error_timer -= 1
+        state = (white_score, black_score, turn, tuple(move_history[-10:]), error)
+        if state == self._scoreboard_state:
+            return
+        self._scoreboard_state = state
+
+        scoreboard_rect = pygame.Rect(self.screen_size, 0, self.scoreboard_width, self.screen_size)
         pygame.draw.rect(self.screen, (200, 200, 200), scoreboard_rect)
 
-        white_score_text = self.score_font.render(f"White Score: {white_score}", True, (0, 0, 0))
+        white_score_text = self._render_text(self.score_font, f"White Score: {white_score}", (0, 0, 0))
         self.screen.blit(white_score_text, (self.screen_size + 10, 10))
-        black_score_text = self.score_font.render(f"Black Score: {black_score}", True, (0, 0, 0))
+        black_score_text = self._render_text(self.score_font, f"Black Score: {black_score}", (0, 0, 0))
         self.screen.blit(black_score_text, (self.screen_size + 10, 40))
 
-        turn_text = self.score_font.render(f"Turn: {'White' if turn else 'Black'}", True, (0, 0, 0))
+        turn_text = self._render_text(self.score_font, f"Turn: {'White' if turn else 'Black'}", (0, 0, 0))
         self.screen.blit(turn_text, (self.screen_size + 10, 70))
 
-        history_title = self.score_font.render("Move History:", True, (0, 0, 0))
+        history_title = self._render_text(self.score_font, "Move History:", (0, 0, 0))
         self.screen.blit(history_title, (self.screen_size + 10, 100))
         for i, move in enumerate(move_history[-10:]):  # Show last 10 moves
-            move_text = self.score_font.render(move, True, (0, 0, 0))
+            move_text = self._render_text(self.score_font, move, (0, 0, 0))
             self.screen.blit(move_text, (self.screen_size + 10, 130 + i * 20))
 
         # Display error message if present
-        if self.error_message and self.error_timer > 0:
-            error_text = self.score_font.render(self.error_message, True, (255, 0, 0))
+        if error:
+            error_text = self._render_text(self.score_font, error, (255, 0, 0))
             self.screen.blit(error_text, (self.screen_size + 10, self.screen_size - 30))
-            self.error_timer -= 1
+        self._dirty.append(scoreboard_rect)
+
+    def draw_fps(self):
+        """Overlay frames per second and the time spent drawing the last frame."""
+        rect = pygame.Rect(self.screen_size + 10, self.screen_size - 55, self.scoreboard_width - 20, 20)
+        self.screen.fill((200, 200, 200), rect)
+        text = self.score_font.render(f"FPS {self.clock.get_fps():5.1f}  frame {self.frame_time * 1000:4.1f} ms",
+                                      True, (60, 60, 60))
+        self.screen.blit(text, rect)
+        self._dirty.append(rect)
 
     def get_promotion_choice(self):
         promotion_options = {
@@ -134,6 +241,8 @@ class ChessGUI:
             pygame.display.flip()
             pygame.event.pump()
             pygame.time.wait(50)
+        # The menu was drawn over the scoreboard
+        self.invalidate()
         return choice
 
     def get_human_move(self, board):
@@ -238,12 +347,19 @@ class ChessGUI:
         pygame.draw.rect(self.screen, (50, 50, 50), (self.screen_size // 4, self.screen_size // 4, self.screen_size // 2, self.screen_size // 4))
         self.screen.blit(result_surface, result_rect)
         pygame.display.flip()
+        self.invalidate()
 
     def update_display(self, board, score, white_score, black_score, turn, move_history):
-        print("Updating display...")
+        start = time.perf_counter()
         self.draw_board(board)
         self.draw_scoreboard(white_score, black_score, turn, move_history)
-        pygame.display.flip()
+        if self.show_fps:
+            self.draw_fps()
+        if self._dirty:
+            pygame.display.update(self._dirty)
+            self._dirty = []
+        self.frame_time = time.perf_counter() - start
+        self.clock.tick()
 
     def quit(self):
         """Properly clean up Pygame resources"""
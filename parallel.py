@@ -0,0 +1,159 @@
+"""Parallel root search: the root moves of a position are split across a
+process pool, and every worker keeps its own ChessAI (and transposition
+table) warm between searches.
+
+Workers share the best root score found so far and search each remaining
+move with a window just below it, so losing moves are refuted cheaply while
+any move that ties or beats the best still gets an exact score. The result
+is picked by score and then by root order, so it does not depend on the
+number of workers or on which worker finishes first.
+
+Run ``python parallel.py`` for a speedup-vs-workers benchmark.
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import chess
+
+from workers import init_worker, worker_ai
+
+BENCH_FENS = [
+    chess.STARTING_FEN,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+]
+
+# Set up in each worker process by _init_worker
+_shared_best = None
+
+
+def _init_worker(hash_mb, shared_best, stop_event):
+    global _shared_best
+    init_worker(hash_mb, stop_event)
+    _shared_best = shared_best
+
+
+def _search_root_move(fen, index, move_uci, depth, deadline):
+    board = chess.Board(fen)
+    sign = 1 if board.turn == chess.WHITE else -1
+    # Best root score so far, from the side to move's point of view
+    best = _shared_best.value
+    if sign == 1:
+        alpha, beta = best - 1, math.inf
+    else:
+        alpha, beta = -math.inf, -best + 1
+
+    ai = worker_ai()
+    ai.board = board
+    time_limit = max(0.0, deadline - time.time()) if deadline is not None else None
+    ai.find_best_move(depth, time_limit=time_limit, root_moves=[chess.Move.from_uci(move_uci)],
+                      alpha=alpha, beta=beta)
+    if ai.depth < depth:
+        # Stopped or out of time before this move was fully searched
+        return index, None, ai.nodes + ai.qnodes
+    score = ai.score
+    with _shared_best.get_lock():
+        if sign * score > _shared_best.value:
+            _shared_best.value = sign * score
+    return index, score, ai.nodes + ai.qnodes
+
+
+class ParallelSearch:
+    def __init__(self, workers=None, hash_mb=16):
+        self.workers = workers or os.cpu_count() or 1
+        # Spawned workers behave the same on every platform and are safe to
+        # start from a background thread (the UCI search thread does this)
+        context = multiprocessing.get_context('spawn')
+        self._shared_best = context.Value('d', -math.inf)
+        self._stop_event = context.Event()
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                         initargs=(hash_mb, self._shared_best, self._stop_event))
+        self.score = 0
+        self.nodes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._stop_event.set()
+        self._pool.shutdown(cancel_futures=True)
+
+    def stop(self):
+        """Make a running find_best_move give up and return None."""
+        self._stop_event.set()
+
+    def find_best_move(self, board, depth=3, time_limit=None):
+        """Search ``board`` to a fixed ``depth``, one task per root move.
+
+        Returns None if ``time_limit`` runs out or stop() is called before
+        every root move was searched to full depth.
+        """
+        # Captures first so a good bound is found early; the sort is stable
+        moves = sorted(board.legal_moves, key=lambda move: not board.is_capture(move))
+        if not moves:
+            return None
+        sign = 1 if board.turn == chess.WHITE else -1
+        with self._shared_best.get_lock():
+            self._shared_best.value = -math.inf
+        self._stop_event.clear()
+        deadline = time.time() + time_limit if time_limit is not None else None
+
+        fen = board.fen()
+        futures = [self._pool.submit(_search_root_move, fen, index, move.uci(), depth, deadline)
+                   for index, move in enumerate(moves)]
+        results = []
+        complete = True
+        self.nodes = 0
+        for future in as_completed(futures):
+            index, score, nodes = future.result()
+            self.nodes += nodes
+            if score is None:
+                complete = False
+            else:
+                results.append((sign * score, -index, score))
+        if not complete:
+            return None
+        _, best_index, self.score = max(results)
+        return moves[-best_index]
+
+
+def benchmark(fens, depth, worker_counts, hash_mb):
+    baseline = None
+    for workers in worker_counts:
+        total_time = 0.0
+        total_nodes = 0
+        answers = []
+        with ParallelSearch(workers, hash_mb) as search:
+            # Start every worker before timing
+            list(search._pool.map(abs, range(workers)))
+            for fen in fens:
+                start = time.perf_counter()
+                move = search.find_best_move(chess.Board(fen), depth)
+                total_time += time.perf_counter() - start
+                total_nodes += search.nodes
+                answers.append((move.uci() if move else None, search.score))
+        if baseline is None:
+            baseline = (total_time, answers)
+        speedup = baseline[0] / total_time if total_time else 0.0
+        same = "yes" if answers == baseline[1] else "NO"
+        print(f"workers={workers:<3} time={total_time:8.2f}s nodes={total_nodes:<9} "
+              f"nps={total_nodes / total_time if total_time else 0:9.0f} speedup={speedup:5.2f}x "
+              f"same_result={same} {answers}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parallel root search against worker count")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--hash", type=int, default=16, help="transposition table size per worker in MB")
+    parser.add_argument("--fen", action="append", help="position to search (repeatable)")
+    args = parser.parse_args()
+    benchmark(args.fen or BENCH_FENS, args.depth, args.workers, args.hash)
@@ -0,0 +1,258 @@
+"""Self-play matches between two ChessAI configurations.
+
+Games start from an opening suite plus a few random plies, with colors
+swapped for every start position, run in a process pool, and are written to
+a PGN file as they finish. After each game the Elo difference (with a 95%
+error bar) and the SPRT log-likelihood ratio are reported; the match stops
+early once the SPRT accepts either hypothesis.
+
+Searches without a time limit are deterministic, so two such engines would
+replay a start position move for move. Every game pair therefore gets a
+start position that has not been played yet; the match ends early if no new
+one can be found (e.g. with --random-plies 0 and more games than openings).
+
+    python selfplay.py --engine1 depth=4 --engine2 depth=3 --games 200 --pgn match.pgn
+    python selfplay.py --engine1 depth=8,time=0.2 --engine2 depth=8,time=0.2,quiescence=0
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import chess
+import chess.pgn
+
+from ai import ChessAI
+from epd import read_epd_file
+
+# Short, balanced openings used when no --openings file is given
+OPENINGS = [
+    "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/pppp1ppp/4p3/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/pp1ppppp/2p5/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkbnr/ppp1pppp/8/3p4/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 0 2",
+    "rnbqkb1r/pppppppp/5n2/8/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 1 2",
+    "rnbqkbnr/pppppppp/8/8/2P5/8/PP1PPPPP/RNBQKBNR b KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/5N2/PPPPPPPP/RNBQKB1R b KQkq - 1 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "rnbqkb1r/pppp1ppp/5n2/4p3/4P3/2N5/PPPP1PPP/R1BQKBNR w KQkq - 2 3",
+]
+
+# Games still running after this many plies are scored as draws
+MAX_PLIES = 300
+
+# Random start positions tried per game pair before the schedule gives up
+MAX_START_ATTEMPTS = 100
+
+
+def parse_engine(spec):
+    """Parse 'depth=4,time=0.5,nodes=20000,hash=16,quiescence=0' into a config dict."""
+    config = {'depth': 3, 'time': None, 'nodes': None, 'hash': 16, 'quiescence': True}
+    for part in filter(None, spec.split(',')):
+        key, _, value = part.partition('=')
+        key = key.strip()
+        if key not in config:
+            raise argparse.ArgumentTypeError(f"unknown engine option '{key}'")
+        if key == 'time':
+            config[key] = float(value)
+        elif key == 'quiescence':
+            config[key] = value.strip().lower() not in ('0', 'false', 'no', 'off')
+        else:
+            config[key] = int(value)
+    config['name'] = spec or 'default'
+    return config
+
+
+def play_game(game_index, opening_fen, white, black):
+    """Play one game; returns (game_index, pgn_text, result string)."""
+    board = chess.Board(opening_fen)
+    engines = {}
+    for color, config in ((chess.WHITE, white), (chess.BLACK, black)):
+        engines[color] = (ChessAI(board, hash_mb=config['hash'], quiescence=config['quiescence']), config)
+
+    while not board.is_game_over(claim_draw=True) and board.ply() < MAX_PLIES:
+        ai, config = engines[board.turn]
+        move = ai.find_best_move(depth=config['depth'], time_limit=config['time'], node_limit=config['nodes'])
+        if move is None:
+            break
+        board.push(move)
+
+    result = board.result(claim_draw=True)
+    if result == '*':
+        result = '1/2-1/2'  # Adjudicated after MAX_PLIES
+    game = chess.pgn.Game.from_board(board)
+    game.headers['Event'] = 'ChessAI self-play'
+    game.headers['Round'] = str(game_index + 1)
+    game.headers['White'] = white['name']
+    game.headers['Black'] = black['name']
+    game.headers['Result'] = result
+    return game_index, str(game), result
+
+
+def elo_from_score(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1) + 0.0  # avoid printing -0.0
+
+
+def score_and_variance(wins, draws, losses):
+    """Mean score per game and its per-game variance, from engine1's results."""
+    games = wins + draws + losses
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    return score, variance
+
+
+def elo_estimate(wins, draws, losses):
+    """Elo difference and 95% error bar from engine1's results."""
+    games = wins + draws + losses
+    score, variance = score_and_variance(wins, draws, losses)
+    margin = 1.96 * math.sqrt(variance / games)
+    elo = elo_from_score(score)
+    error = (elo_from_score(score + margin) - elo_from_score(score - margin)) / 2
+    return elo, error
+
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    """Log-likelihood ratio of H1 (elo1) against H0 (elo0), normal approximation."""
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0
+    score, variance = score_and_variance(wins, draws, losses)
+    if variance == 0:
+        return 0.0
+    score0 = 1 / (1 + 10 ** (-elo0 / 400))
+    score1 = 1 / (1 + 10 ** (-elo1 / 400))
+    return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+
+def is_deterministic(config):
+    # Without a time limit a search plays the same move every time
+    return config['time'] is None
+
+
+def start_positions(openings, pairs, random_plies, unique):
+    """Yield one start FEN per game pair: an opening followed by ``random_plies`` random moves.
+
+    With ``unique`` no start position is repeated; the positions run out
+    early when no new one turns up in MAX_START_ATTEMPTS tries.
+    """
+    seen = set()
+    for pair in range(pairs):
+        rng = random.Random(pair)  # Same schedule on every run
+        for attempt in range(MAX_START_ATTEMPTS):
+            board = chess.Board(openings[pair % len(openings)] if attempt == 0 else rng.choice(openings))
+            for _ in range(random_plies):
+                moves = list(board.legal_moves)
+                if not moves:
+                    break
+                board.push(rng.choice(moves))
+            key = board.epd()
+            if board.is_game_over() or (unique and key in seen):
+                continue
+            seen.add(key)
+            yield board.fen()
+            break
+        else:
+            print(f"Only {pair} distinct start positions available; playing {2 * pair} games")
+            return
+
+
+def game_schedule(openings, games, engine1, engine2, random_plies):
+    # Each start position is played twice with colors swapped
+    unique = is_deterministic(engine1) and is_deterministic(engine2)
+    pairs = (games + 1) // 2
+    for pair, start_fen in enumerate(start_positions(openings, pairs, random_plies, unique)):
+        yield 2 * pair, start_fen, engine1, engine2
+        if 2 * pair + 1 < games:
+            yield 2 * pair + 1, start_fen, engine2, engine1
+
+
+def run_match(engine1, engine2, games, openings, random_plies, workers, pgn_path, elo0, elo1, alpha, beta):
+    lower = math.log(beta / (1 - alpha))
+    upper = math.log((1 - beta) / alpha)
+    wins = draws = losses = 0
+    verdict = None
+    start = time.perf_counter()
+    pgn_file = open(pgn_path, 'w', encoding='utf-8') if pgn_path else None
+    schedule = game_schedule(openings, games, engine1, engine2, random_plies)
+    pending = {}
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            while verdict is None:
+                # Keep a couple of games per worker queued
+                for index, opening, white, black in schedule:
+                    future = pool.submit(play_game, index, opening, white, black)
+                    pending[future] = white is engine1
+                    if len(pending) >= workers * 2:
+                        break
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    engine1_white = pending.pop(future)
+                    index, pgn_text, result = future.result()
+                    if pgn_file:
+                        pgn_file.write(pgn_text + "\n\n")
+                        pgn_file.flush()
+                    if result == '1/2-1/2':
+                        draws += 1
+                    elif (result == '1-0') == engine1_white:
+                        wins += 1
+                    else:
+                        losses += 1
+
+                    elo, error = elo_estimate(wins, draws, losses)
+                    llr = sprt_llr(wins, draws, losses, elo0, elo1)
+                    print(f"Game {index + 1:>4} {result:>7}  engine1 +{wins} ={draws} -{losses}  "
+                          f"Elo {elo:+.1f} +/- {error:.1f}  LLR {llr:.2f} [{lower:.2f}, {upper:.2f}]")
+                    if llr >= upper:
+                        verdict = "H1 accepted: engine1 is stronger"
+                    elif llr <= lower:
+                        verdict = "H0 accepted: engine1 is not stronger"
+            # Stop early: drop games that have not started
+            for future in pending:
+                future.cancel()
+    finally:
+        if pgn_file:
+            pgn_file.close()
+
+    total = wins + draws + losses
+    if total:
+        elo, error = elo_estimate(wins, draws, losses)
+        print(f"\n{engine1['name']} vs {engine2['name']}: +{wins} ={draws} -{losses} in {total} games "
+              f"({time.perf_counter() - start:.0f}s)")
+        print(f"Elo difference: {elo:+.1f} +/- {error:.1f} (95%)")
+    print(f"SPRT(elo0={elo0}, elo1={elo1}, alpha={alpha}, beta={beta}): {verdict or 'inconclusive'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play ChessAI against itself with two configurations")
+    parser.add_argument('--engine1', type=parse_engine, default=parse_engine('depth=3'),
+                        help="config under test, e.g. depth=4,time=0.5,nodes=20000,hash=16,quiescence=1")
+    parser.add_argument('--engine2', type=parse_engine, default=parse_engine('depth=2'),
+                        help="baseline config, same format as --engine1")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--openings', help="EPD file with start positions (default: built-in suite)")
+    parser.add_argument('--random-plies', type=int, default=2,
+                        help="random moves played after each opening so game pairs differ (default 2)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--pgn', help="write finished games to this PGN file")
+    parser.add_argument('--elo0', type=float, default=0.0)
+    parser.add_argument('--elo1', type=float, default=10.0)
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    openings = [board.fen() for _, board, _ in read_epd_file(args.openings)] if args.openings else OPENINGS
+    if not openings:
+        sys.exit("No openings to play")
+    run_match(args.engine1, args.engine2, args.games, openings, args.random_plies, args.workers, args.pgn,
+              args.elo0, args.elo1, args.alpha, args.beta)
+
+
+if __name__ == '__main__':
+    main()
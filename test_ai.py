@@ -0,0 +1,92 @@
+import random
+
+import chess
+import pytest
+
+from ai import MATE_SCORE, ChessAI, IncrementalEvaluator, TranspositionTable
+
+POSITIONS = [
+    chess.STARTING_FEN,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+]
+
+
+class NoTable(TranspositionTable):
+    """A table that never finds anything, for searching without the TT."""
+
+    def lookup(self, key):
+        return None
+
+
+def random_playouts(board, rng, games, max_plies):
+    """Play random games with IncrementalEvaluator(check=True), undoing some moves on the way."""
+    evaluator = IncrementalEvaluator(check=True)
+    seen = {'castling': 0, 'en_passant': 0, 'promotion': 0}
+    for _ in range(games):
+        evaluator.reset(board)
+        while not board.is_game_over() and len(board.move_stack) < max_plies:
+            move = rng.choice(list(board.legal_moves))
+            if board.is_castling(move):
+                seen['castling'] += 1
+            if board.is_en_passant(move):
+                seen['en_passant'] += 1
+            if move.promotion:
+                seen['promotion'] += 1
+            evaluator.push(board, move)
+            if board.move_stack and rng.random() < 0.1:
+                evaluator.pop(board)
+        while board.move_stack:
+            evaluator.pop(board)
+    return seen
+
+
+def test_incremental_eval_matches_full_recompute():
+    rng = random.Random(2024)
+    seen = random_playouts(chess.Board(), rng, games=60, max_plies=200)
+    # The playouts must have exercised the special moves
+    assert all(seen.values()), seen
+
+
+def test_incremental_eval_matches_full_recompute_chess960():
+    rng = random.Random(960)
+    castles = 0
+    for _ in range(30):
+        board = chess.Board.from_chess960_pos(rng.randrange(960))
+        castles += random_playouts(board, rng, games=2, max_plies=200)['castling']
+    # Chess960 castling is encoded as king-takes-rook
+    assert castles
+
+
+@pytest.mark.parametrize("fen", POSITIONS)
+@pytest.mark.parametrize("depth", [3, 4])
+def test_transposition_table_does_not_change_score(fen, depth):
+    with_table = ChessAI(chess.Board(fen))
+    with_table.find_best_move(depth)
+    without_table = ChessAI(chess.Board(fen))
+    without_table.tt = NoTable(1)
+    without_table.find_best_move(depth)
+    assert with_table.score == without_table.score
+    assert with_table.stats['hits'] > 0
+
+
+def test_search_checks_incremental_eval():
+    ai = ChessAI(chess.Board(POSITIONS[1]), check_eval=True)
+    assert ai.find_best_move(3) is not None
+
+
+@pytest.mark.parametrize("depth", [1, 3])
+def test_finds_back_rank_mate(depth):
+    ai = ChessAI(chess.Board("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1"))
+    assert ai.find_best_move(depth) == chess.Move.from_uci("d1d8")
+    assert ai.score == MATE_SCORE - 1
+
+
+def test_quiescence_scores_mate_instead_of_standing_pat():
+    # Black is checkmated; standing pat would return the material balance
+    board = chess.Board("3R2k1/5ppp/8/8/8/8/5PPP/6K1 b - - 0 1")
+    ai = ChessAI(board)
+    ai.evaluator.reset(board)
+    assert ai.quiescence(board, False) == MATE_SCORE
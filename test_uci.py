@@ -0,0 +1,102 @@
+import queue
+import struct
+
+import chess
+import chess.polyglot
+import pytest
+
+from uci import UCIEngine
+
+
+class LineOutput:
+    """File-like engine output that hands each line to the test."""
+
+    def __init__(self):
+        self.lines = queue.Queue()
+        self._buffer = ""
+
+    def write(self, text):
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self.lines.put(line)
+
+    def flush(self):
+        pass
+
+    def wait_for(self, prefix, timeout=10):
+        """Return the next line starting with ``prefix``; fails after ``timeout`` seconds."""
+        while True:
+            line = self.lines.get(timeout=timeout)
+            if line.startswith(prefix):
+                return line
+
+    def collect(self, timeout=0.5):
+        """Every line written within ``timeout`` seconds."""
+        lines = []
+        try:
+            while True:
+                lines.append(self.lines.get(timeout=timeout))
+        except queue.Empty:
+            return lines
+
+
+def write_book(path, board, move):
+    # One Polyglot entry: key, move, weight, learn (big-endian)
+    from_square, to_square = move.from_square, move.to_square
+    encoded = (chess.square_file(to_square) | chess.square_rank(to_square) << 3
+               | chess.square_file(from_square) << 6 | chess.square_rank(from_square) << 9)
+    with open(path, 'wb') as handle:
+        handle.write(struct.pack(">QHHI", chess.polyglot.zobrist_hash(board), encoded, 1, 0))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    output = LineOutput()
+    uci = UCIEngine(output=output)
+    book = tmp_path / "book.bin"
+    write_book(book, chess.Board(), chess.Move.from_uci("e2e4"))
+    uci.handle_command(f"setoption name BookFile value {book}")
+    yield uci, output
+    uci.stop()
+    uci._close_parallel()
+
+
+@pytest.mark.parametrize("threads", [1, 2])
+def test_book_move_is_played_with_any_thread_count(engine, threads):
+    uci, output = engine
+    uci.handle_command(f"setoption name Threads value {threads}")
+    uci.handle_command("position startpos")
+    uci.handle_command("go depth 3")
+    assert output.wait_for("bestmove") == "bestmove e2e4"
+
+
+@pytest.mark.parametrize("threads", [1, 2])
+def test_go_infinite_waits_for_stop(engine, threads):
+    # The book answers at once, but bestmove must wait for stop
+    uci, output = engine
+    uci.handle_command(f"setoption name Threads value {threads}")
+    uci.handle_command("position startpos")
+    uci.handle_command("go infinite")
+    assert not any(line.startswith("bestmove") for line in output.collect())
+    uci.handle_command("stop")
+    assert output.wait_for("bestmove") == "bestmove e2e4"
+
+
+def test_go_ponder_waits_for_ponderhit(engine):
+    uci, output = engine
+    uci.handle_command("position startpos")
+    uci.handle_command("go ponder wtime 60000 btime 60000")
+    assert not any(line.startswith("bestmove") for line in output.collect())
+    uci.handle_command("ponderhit")
+    assert output.wait_for("bestmove") == "bestmove e2e4"
+
+
+def test_go_ponder_depth_limit_waits_for_stop(engine):
+    # A search that reaches its depth limit while pondering also waits
+    uci, output = engine
+    uci.handle_command("position startpos moves e2e4")
+    uci.handle_command("go ponder depth 1")
+    assert not any(line.startswith("bestmove") for line in output.collect())
+    uci.handle_command("stop")
+    assert output.wait_for("bestmove").startswith("bestmove ")
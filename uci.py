@@ -0,0 +1,323 @@
+"""UCI front-end so ChessAI can run as a standalone engine process.
+
+    python uci.py
+
+Supports uci, isready, ucinewgame, setoption (Hash, Threads, Ponder,
+BookFile, SyzygyPath), position, go (depth, movetime,
+wtime/btime/winc/binc/movestogo, nodes, searchmoves, ponder, infinite),
+ponderhit, stop and quit. Searches run on a background thread so
+``stop`` and ``isready`` are answered while the engine is thinking.
+"""
+import sys
+import threading
+import time
+
+import chess
+
+from ai import MATE_BOUND, MATE_SCORE, ChessAI
+from book import OpeningBook, Tablebase
+
+ENGINE_NAME = "ChessAI"
+ENGINE_AUTHOR = "ChessAI contributors"
+
+MAX_DEPTH = 64
+DEFAULT_MOVES_TO_GO = 30
+MOVE_OVERHEAD = 0.05  # seconds kept back for communication lag
+
+# go parameters followed by a number; searchmoves takes a list of moves and
+# ponder/infinite take nothing
+GO_VALUE_KEYWORDS = ('wtime', 'btime', 'winc', 'binc', 'movestogo', 'depth', 'nodes', 'mate', 'movetime')
+GO_KEYWORDS = GO_VALUE_KEYWORDS + ('searchmoves', 'ponder', 'infinite')
+
+
+class UCIEngine:
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.board = chess.Board()
+        self.hash_mb = 16
+        self.threads = 1
+        self.ai = ChessAI(self.board, hash_mb=self.hash_mb)
+        self.ai.on_iteration = self._send_info
+        self.parallel = None
+        self.search_thread = None
+        self.handle = None
+        self._ponder_time_limit = None
+        self._parallel_stop = False
+        self._output_lock = threading.Lock()
+        # Under go ponder/infinite a finished search keeps its bestmove until
+        # stop or ponderhit arrives, as UCI requires
+        self._infinite = False
+        self._hold_bestmove = False
+        self._held_bestmove = None
+        self._bestmove_lock = threading.Lock()
+
+    def send(self, line):
+        with self._output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def run(self, lines=sys.stdin):
+        for line in lines:
+            if not self.handle_command(line.strip()):
+                break
+        self.stop()
+        if self.parallel is not None:
+            self.parallel.close()
+
+    def handle_command(self, line):
+        """Handle one UCI command; returns False on quit."""
+        if not line:
+            return True
+        command, _, rest = line.partition(" ")
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {self.hash_mb} min 1 max 4096")
+            self.send(f"option name Threads type spin default {self.threads} min 1 max 256")
+            self.send("option name Ponder type check default false")
+            self.send("option name BookFile type string default <empty>")
+            self.send("option name SyzygyPath type string default <empty>")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stop()
+            self.ai.tt.clear()
+        elif command == "setoption":
+            self.stop()
+            self.set_option(rest)
+        elif command == "position":
+            self.stop()
+            self.set_position(rest.split())
+        elif command == "go":
+            self.stop()
+            self.go(rest.split())
+        elif command == "ponderhit":
+            if self.handle is not None and self._ponder_time_limit is not None:
+                self.handle.ponderhit(self._ponder_time_limit)
+            self._ponder_time_limit = None
+            # "go ponder infinite" turns into an infinite search: still wait for stop
+            if not self._infinite:
+                self._release_bestmove()
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            return False
+        elif command == "d":
+            self.send(str(self.board))
+            self.send(f"Fen: {self.board.fen()}")
+        else:
+            self.send(f"info string unknown command {command}")
+        return True
+
+    def set_option(self, text):
+        # setoption name <id> [value <x>]
+        name, _, value = text.partition(" value ")
+        name = name.replace("name", "", 1).strip().lower()
+        value = value.strip()
+        try:
+            if name == "hash":
+                self.hash_mb = max(1, int(value))
+                self.ai.tt.resize(self.hash_mb)
+                self._close_parallel()
+            elif name == "threads":
+                self.threads = max(1, int(value))
+                self._close_parallel()
+            elif name == "ponder":
+                pass  # Pondering is driven by "go ponder"; nothing to switch on
+            elif name == "bookfile":
+                self.ai.book = OpeningBook(value) if value and value != "<empty>" else None
+            elif name == "syzygypath":
+                self.ai.tablebase = Tablebase(value) if value and value != "<empty>" else None
+            else:
+                self.send(f"info string unknown option {name}")
+        except (OSError, ValueError) as e:
+            self.send(f"info string cannot set {name}: {e}")
+
+    def set_position(self, tokens):
+        if not tokens:
+            return
+        if tokens[0] == "startpos":
+            board = chess.Board()
+            tokens = tokens[1:]
+        elif tokens[0] == "fen":
+            fen_parts = []
+            tokens = tokens[1:]
+            while tokens and tokens[0] != "moves":
+                fen_parts.append(tokens.pop(0))
+            try:
+                board = chess.Board(" ".join(fen_parts))
+            except ValueError as e:
+                self.send(f"info string invalid fen: {e}")
+                return
+        else:
+            return
+        if tokens and tokens[0] == "moves":
+            for uci in tokens[1:]:
+                try:
+                    board.push_uci(uci)
+                except ValueError:
+                    self.send(f"info string illegal move {uci}")
+                    break
+        self.board = board
+        self.ai.board = board
+
+    def parse_go(self, tokens):
+        """Split go arguments into (numeric params, flags, searchmoves list)."""
+        params = {}
+        flags = set()
+        search_moves = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in ("ponder", "infinite"):
+                flags.add(token)
+            elif token == "searchmoves":
+                while i + 1 < len(tokens) and tokens[i + 1] not in GO_KEYWORDS:
+                    i += 1
+                    try:
+                        search_moves.append(self.board.parse_uci(tokens[i]))
+                    except ValueError:
+                        self.send(f"info string illegal searchmove {tokens[i]}")
+            elif token in GO_VALUE_KEYWORDS and i + 1 < len(tokens):
+                try:
+                    params[token] = int(tokens[i + 1])
+                    i += 1
+                except ValueError:
+                    pass  # The bad value is reported as an unknown token next
+            else:
+                # Unknown tokens are skipped one at a time so a following
+                # keyword is still seen
+                self.send(f"info string ignoring go token {token}")
+            i += 1
+        return params, flags, search_moves
+
+    def _time_limit(self, params):
+        if "movetime" in params:
+            return max(0.0, params["movetime"] / 1000 - MOVE_OVERHEAD)
+        remaining = params.get("wtime" if self.board.turn == chess.WHITE else "btime")
+        if remaining is None:
+            return None
+        increment = params.get("winc" if self.board.turn == chess.WHITE else "binc", 0)
+        moves_to_go = params.get("movestogo", DEFAULT_MOVES_TO_GO)
+        budget = remaining / max(1, moves_to_go) + increment * 0.8
+        return max(0.0, min(budget, remaining * 0.5) / 1000 - MOVE_OVERHEAD)
+
+    def go(self, tokens):
+        params, flags, search_moves = self.parse_go(tokens)
+        depth = params.get("depth", MAX_DEPTH)
+        node_limit = params.get("nodes")
+        time_limit = None if "infinite" in flags else self._time_limit(params)
+        self._ponder_time_limit = None
+        self._infinite = "infinite" in flags
+        with self._bestmove_lock:
+            self._hold_bestmove = "ponder" in flags or self._infinite
+            self._held_bestmove = None
+        if "ponder" in flags:
+            # Search without a clock until ponderhit hands over the budget
+            self._ponder_time_limit = time_limit
+            time_limit = None
+
+        if self.threads > 1 and node_limit is None and not search_moves and "ponder" not in flags:
+            self._parallel_stop = False
+            self.search_thread = threading.Thread(target=self._run_parallel, args=(depth, time_limit), daemon=True)
+        else:
+            self.handle = self.ai.start_search(depth=depth, time_limit=time_limit, node_limit=node_limit,
+                                               root_moves=search_moves or None)
+            self.search_thread = threading.Thread(target=self._wait_for_search, daemon=True)
+        self.search_thread.start()
+
+    def _wait_for_search(self):
+        move = self.handle.result()
+        if self.ai.source != "search" and move is not None:
+            self.send(f"info string {self.ai.source} move")
+        self._send_bestmove(move)
+
+    def _run_parallel(self, depth, time_limit):
+        # Parallel search works at a fixed depth, so deepen one depth at a
+        # time and check the clock and stop flag in between
+        board = self.board.copy()
+        # Workers only search, so the book and tablebases are checked here
+        if self.ai._probe_book_and_tablebase(board):
+            self.send(f"info string {self.ai.source} move")
+            self._send_bestmove(self.ai.best_move)
+            return
+        from parallel import ParallelSearch
+        if self.parallel is None:
+            self.parallel = ParallelSearch(self.threads, self.hash_mb)
+        start = time.perf_counter()
+        best_move = None
+        for current_depth in range(1, depth + 1):
+            remaining = None
+            if time_limit is not None and best_move is not None:
+                remaining = max(0.0, time_limit - (time.perf_counter() - start))
+            # The first depth always completes so there is a move to play
+            move = self.parallel.find_best_move(board, current_depth, remaining)
+            if move is None:
+                break
+            best_move = move
+            self._send_info({
+                'depth': current_depth,
+                'score': self.parallel.score,
+                'nodes': self.parallel.nodes,
+                'qnodes': 0,
+                'time': time.perf_counter() - start,
+                'pv': [move],
+            })
+            if self._parallel_stop or (time_limit is not None and time.perf_counter() - start >= time_limit):
+                break
+        self._send_bestmove(best_move)
+
+    def _send_info(self, info):
+        nodes = info['nodes'] + info['qnodes']
+        elapsed = info['time']
+        # UCI scores are from the side to move's point of view
+        score = info['score'] if self.board.turn == chess.WHITE else -info['score']
+        if abs(score) > MATE_BOUND:
+            # Mate in N moves; negative when the side to move gets mated
+            moves = (MATE_SCORE - abs(score) + 1) // 2
+            score_text = f"mate {moves if score > 0 else -moves}"
+        else:
+            score_text = f"cp {int(score)}"
+        nps = int(nodes / elapsed) if elapsed > 0 else 0
+        pv = " ".join(move.uci() for move in info['pv'])
+        self.send(f"info depth {info['depth']} score {score_text} nodes {nodes} nps {nps} "
+                  f"time {int(elapsed * 1000)} pv {pv}")
+
+    def _send_bestmove(self, move):
+        with self._bestmove_lock:
+            if self._hold_bestmove:
+                self._held_bestmove = (move,)
+                return
+        self.send(f"bestmove {move.uci() if move else '0000'}")
+
+    def _release_bestmove(self):
+        """Stop holding back bestmove, and send it if the search already finished."""
+        with self._bestmove_lock:
+            self._hold_bestmove = False
+            held, self._held_bestmove = self._held_bestmove, None
+        if held is not None:
+            self._send_bestmove(held[0])
+
+    def stop(self):
+        """Stop a running search; its bestmove is sent before this returns."""
+        if self.search_thread is None:
+            return
+        self._parallel_stop = True
+        if self.parallel is not None:
+            self.parallel.stop()
+        if self.handle is not None:
+            self.handle.stop()
+        self.search_thread.join()
+        self._release_bestmove()
+        self.search_thread = None
+        self.handle = None
+
+    def _close_parallel(self):
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+
+
+if __name__ == "__main__":
+    UCIEngine().run()
@@ -0,0 +1,21 @@
+"""Per-process ChessAI for the process-pool tools (analyze.py, parallel.py).
+
+Pass ``init_worker`` as the pool initializer; each worker then keeps one
+engine, and its transposition table, warm between tasks.
+"""
+import chess
+
+from ai import ChessAI
+
+# Set up in each worker process by init_worker
+_worker_ai = None
+
+
+def init_worker(hash_mb, stop_event=None):
+    global _worker_ai
+    _worker_ai = ChessAI(chess.Board(), hash_mb=hash_mb, stop_event=stop_event)
+
+
+def worker_ai():
+    """The engine of the current worker process."""
+    return _worker_ai